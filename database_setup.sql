@@ -16,7 +16,9 @@ CREATE TABLE airports (
     latitude DECIMAL(10,6),
     longitude DECIMAL(10,6),
     altitude INTEGER,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT airports_coordinates_check
+        CHECK (latitude BETWEEN -90 AND 90 AND longitude BETWEEN -180 AND 180)
 );
 
 -- Flights table - stores current flight information from API
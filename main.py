@@ -10,6 +10,8 @@ This script runs the complete ETL pipeline:
 Run with: python main.py
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 from src.extract_data import extract_airports, extract_flights
 from src.transform_data import clean_airports, clean_flights, combine_data
 from src.load_data import load_to_database, verify_data
@@ -24,15 +26,22 @@ def main():
     print("📥 Extracting data from sources...")
     
     # Call the extraction functions
-    airports = extract_airports()
-    flights = extract_flights()
-    
-    # Step 2: Transform data
-    print("\n=== TRANSFORMATION ===")
-    print("🔄 Cleaning and transforming data...")
+    # Both sources are I/O bound, so read the CSV and call the API at the
+    # same time. Airports are cleaned while the API request is still running.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        future_airports = executor.submit(extract_airports)
+        future_flights = executor.submit(extract_flights)
+        airports = future_airports.result()
+        
+        # Step 2: Transform data
+        print("\n=== TRANSFORMATION ===")
+        print("🔄 Cleaning and transforming data...")
+        
+        # Call the transformation functions
+        # Invalid coordinates are filtered by PostgreSQL during the load
+        clean_airports_data = clean_airports(airports, filter_coordinates=False)
+        flights = future_flights.result()
     
-    # Call the transformation functions
-    clean_airports_data = clean_airports(airports)
     clean_flights_data = clean_flights(flights)
     final_airports, final_flights = combine_data(clean_airports_data, clean_flights_data)
     
@@ -6,10 +6,113 @@ This module handles extracting data from different sources:
 - Live flight data from OpenSky Network API
 """
 
+import numpy as np
+import orjson
 import pandas as pd
 import requests
-import time
+import requests_cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Run as part of the package (main.py) or directly as a script
+if __package__:
+    from .schema import FLIGHT_COLUMNS
+else:
+    from schema import FLIGHT_COLUMNS
+
+# Polars is optional: it reads large CSV files faster than pandas
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+# Project folder, found from this file's location so the pipeline
+# works from any directory
+PROJECT_DIR = Path(__file__).resolve().parents[1]
+
+# Airports CSV file
+AIRPORTS_CSV = PROJECT_DIR / 'data' / 'airports.csv'
+
+# HTTP cache for OpenSky responses (requests_cache adds '.sqlite')
+HTTP_CACHE = PROJECT_DIR / '.opensky_cache'
+
+# Kept-alive connections per host, also the most areas fetched at once
+HTTP_POOL_SIZE = 4
+
+# Shared HTTP session for the OpenSky API (created on first use)
+SESSION = None
+SESSION_LOCK = threading.Lock()
+
+# API endpoint for OpenSky Network
+OPENSKY_URL = "https://opensky-network.org/api/states/all"
+
+# Default area for flight data: a small part of Europe, to reduce data size
+EUROPE_AREA = {
+    'lamin': 45,  # South boundary (latitude)
+    'lomin': 5,   # West boundary (longitude) 
+    'lamax': 50,  # North boundary (latitude)
+    'lomax': 15   # East boundary (longitude)
+}
+
+# Values that mark missing data in airports.csv
+AIRPORT_NA_VALUES = ['', 'N', '\\N']
+
+# Folder for parsed flight data, so cached responses don't need parsing again
+CACHE_DIR = PROJECT_DIR / '.cache'
+
+# Type of each column of a state vector returned by the OpenSky API
+# (columns not listed are kept as Python objects).
+# Missing values become NaN in float columns and <NA> in the nullable
+# 'Int64' / 'boolean' columns.
+FLIGHT_COLUMN_TYPES = {
+    'time_position': np.float64,
+    'last_contact': 'Int64',
+    'longitude': np.float64,
+    'latitude': np.float64,
+    'altitude': np.float64,
+    'on_ground': 'boolean',
+    'velocity': np.float64,
+    'true_track': np.float64,
+    'vertical_rate': np.float64,
+    'geo_altitude': np.float64,
+    'spi': 'boolean',
+    'position_source': 'Int64',
+}
+
+# Every column, in API order, with the dtype it is stored as
+FLIGHT_DTYPES = {
+    name: FLIGHT_COLUMN_TYPES.get(name, object) for name in FLIGHT_COLUMNS
+}
+
+def get_session():
+    """
+    Get the shared HTTP session for the OpenSky API, creating it on first use
+    
+    The session keeps the connection alive between calls, asks for
+    compressed responses and retries failed requests with a small backoff.
+    Responses are cached on disk for 30 seconds, then revalidated with
+    conditional requests (ETag / Last-Modified) so unchanged data is not resent.
+    
+    Returns:
+        requests_cache.CachedSession: Session shared by all API calls
+    """
+    global SESSION
+    # Several threads can ask for the session at the same time
+    with SESSION_LOCK:
+        if SESSION is None:
+            session = requests_cache.CachedSession(HTTP_CACHE, expire_after=30)
+            session.headers['Accept-Encoding'] = 'gzip, deflate'
+            session.mount('https://', HTTPAdapter(
+                pool_connections=HTTP_POOL_SIZE,
+                pool_maxsize=HTTP_POOL_SIZE,
+                max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+            ))
+            SESSION = session
+    return SESSION
 
 def extract_airports():
     """
@@ -25,7 +128,31 @@ def extract_airports():
         # The file is located at: data/airports.csv
         # Hint: Use pd.read_csv()
 
-        df = pd.read_csv("/home/barnabe/ETL-AirLife/data/airports.csv")
+        if pl is not None:
+            # Polars memory-maps the file and parses it on all cores, then
+            # hands the columns to pandas as Arrow arrays without copying.
+            # Altitude is read as text and cast non-strictly, so bad values
+            # become null instead of failing the whole file.
+            df = pl.read_csv(
+                AIRPORTS_CSV,
+                null_values=AIRPORT_NA_VALUES,
+                schema_overrides={'altitude': pl.Utf8},
+                low_memory=False
+            ).with_columns(
+                pl.col('altitude').cast(pl.Float64, strict=False)
+            ).to_pandas(use_pyarrow_extension_array=True)
+        else:
+            # Use the multi-threaded PyArrow parser and keep the columns as
+            # Arrow arrays. Altitude is read as text so one bad value doesn't
+            # fail the whole file; clean_airports converts it to numbers.
+            df = pd.read_csv(
+                AIRPORTS_CSV,
+                engine='pyarrow',
+                dtype_backend='pyarrow',
+                dtype={'altitude': 'string[pyarrow]'},
+                na_values=AIRPORT_NA_VALUES,
+                keep_default_na=False
+            )
         
         # TODO: Print how many airports were loaded
         # Example: print(f"Loaded {len(df)} airports")
@@ -38,33 +165,71 @@ def extract_airports():
         print(f"❌ Error reading airport data: {e}")
         return pd.DataFrame()
 
-def extract_flights():
+def extract_flights(areas=None):
     """
     Extract current flight data from OpenSky Network API
     
+    Several areas are fetched at the same time (up to HTTP_POOL_SIZE
+    requests in parallel), so the total wait is about the slowest request
+    instead of the sum.
+    
+    Args:
+        areas (list): Bounding boxes to fetch, as dicts with lamin, lomin,
+            lamax and lomax keys (default: [EUROPE_AREA])
+    
     Returns:
         pandas.DataFrame: Flight data with current aircraft positions
     """
     print("🌐 Fetching live flight data from API...")
     
-    # API endpoint for OpenSky Network
-    url = "https://opensky-network.org/api/states/all"
+    if areas is None:
+        areas = [EUROPE_AREA]
     
-    # Parameters to limit to a smaller area (Europe) to reduce data size
-    params = {
-        'lamin': 45,  # South boundary (latitude)
-        'lomin': 5,   # West boundary (longitude) 
-        'lamax': 50,  # North boundary (latitude)
-        'lomax': 15   # East boundary (longitude)
-    }
+    if not areas:
+        print("⚠️ No areas to fetch")
+        return pd.DataFrame()
     
+    print("Making API request... (this may take a few seconds)")
+    
+    if len(areas) == 1:
+        df = extract_flights_area(areas[0])
+        print(f"Found {len(df)} active flights")
+        return df
+    
+    # No more threads than pooled connections, so every request can
+    # reuse a kept-alive connection
+    with ThreadPoolExecutor(max_workers=min(len(areas), HTTP_POOL_SIZE)) as executor:
+        frames = list(executor.map(extract_flights_area, areas))
+    
+    # Print from the main thread so lines from different areas don't mix
+    for area, frame in zip(areas, frames):
+        print(f"Found {len(frame)} active flights in area {area}")
+    
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    
+    # Areas can overlap, keep each aircraft only once
+    df = pd.concat(frames, ignore_index=True).drop_duplicates(subset='icao24')
+    print(f"Found {len(df)} active flights in {len(areas)} areas")
+    return df
+
+def extract_flights_area(params):
+    """
+    Extract current flight data for one area from OpenSky Network API
+    
+    Args:
+        params (dict): Bounding box with lamin, lomin, lamax and lomax keys
+    
+    Returns:
+        pandas.DataFrame: Flight data with current aircraft positions
+        (the caller prints how many flights were found)
+    """
     try:
-        print("Making API request... (this may take a few seconds)")
-        
         # TODO: Make the API request using requests.get()
         # Hint: response = requests.get(url, params=params, timeout=10)
 
-        response = requests.get(url, params=params, timeout=10)
+        response = get_session().get(OPENSKY_URL, params=params, timeout=10)
         
         # TODO: Check if the response is successful
         # Hint: Check response.status_code == 200
@@ -77,10 +242,20 @@ def extract_flights():
             print(f"⚠️ API returned status code: {response.status_code}")
             return pd.DataFrame()
         
+        # If the response came from the HTTP cache, reuse the DataFrame
+        # parsed from it last time
+        cache_file = os.path.join(
+            CACHE_DIR,
+            "flights_{lamin}_{lomin}_{lamax}_{lomax}.parquet".format(**params)
+        )
+        if response.from_cache and os.path.exists(cache_file):
+            return pd.read_parquet(cache_file)
+
         # TODO: Get the JSON data from the response
         # Hint: data = response.json()
+        # orjson parses the raw bytes much faster than the standard json module
 
-        data = response.json()
+        data = orjson.loads(response.content)
         
         # TODO: Extract the 'states' data from the JSON
         # The API returns: {"time": 123456789, "states": [[aircraft_data], [aircraft_data], ...]}
@@ -90,13 +265,23 @@ def extract_flights():
         
         # TODO: Convert to DataFrame
         # Hint: df = pd.DataFrame(states)
+        # Build the DataFrame column by column: each column is converted once
+        # to a typed numpy array instead of pandas guessing the type per cell
 
-        df = pd.DataFrame(states)
+        if states:
+            columns = list(zip(*states))
+            df = pd.DataFrame({
+                name: flight_column(values, dtype)
+                for (name, dtype), values in zip(FLIGHT_DTYPES.items(), columns)
+            })
+        else:
+            df = pd.DataFrame()
+        
+        save_flights_cache(df, cache_file)
         
         # TODO: Print how many flights were found
         # Example: print(f"Found {len(df)} active flights")
-
-        print(f"Found {len(df)} active flights")
+        # (printed by extract_flights, which may run several areas at once)
 
         return df
         
@@ -111,6 +296,48 @@ def extract_flights():
         print(f"❌ Error processing flight data: {e}")
         return pd.DataFrame()
 
+def flight_column(values, dtype):
+    """
+    Convert the values of one state vector column to a 1-D typed array
+    
+    Args:
+        values (tuple): Values of the column, one per aircraft
+        dtype: Type from FLIGHT_DTYPES
+    
+    Returns:
+        numpy.ndarray or pandas array: Column data
+    """
+    if dtype is object:
+        # fromiter keeps each value as one element, even lists
+        # (e.g. 'sensors'), where np.asarray would build a 2-D array
+        return np.fromiter(values, dtype=object, count=len(values))
+    if isinstance(dtype, str):
+        # Nullable pandas types accept None
+        return pd.array(values, dtype=dtype)
+    return np.asarray(values, dtype=dtype)
+
+def save_flights_cache(df, cache_file):
+    """
+    Save parsed flights for the next cached response of the same area
+    
+    The old file is always removed first, so a cached response can never
+    be answered with flights from an earlier response. Caching is best
+    effort: errors are reported but don't stop the extraction.
+    
+    Args:
+        df (pandas.DataFrame): Flights parsed from a fresh response
+        cache_file (str): Parquet file for this area
+    """
+    try:
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+        
+        if not df.empty:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df.to_parquet(cache_file, compression='zstd')
+    except Exception as e:
+        print(f"⚠️ Could not cache flight data: {e}")
+
 def test_api_connection():
     """
     Test function to check if the OpenSky API is accessible
@@ -119,14 +346,14 @@ def test_api_connection():
     print("🔍 Testing API connection...")
     
     try:
-        response = requests.get(
-            "https://opensky-network.org/api/states/all",
+        response = get_session().get(
+            OPENSKY_URL,
             params={'lamin': 45, 'lomin': 5, 'lamax': 46, 'lomax': 6},
             timeout=5
         )
         
         if response.status_code == 200:
-            data = response.json()
+            data = orjson.loads(response.content)
             flight_count = len(data['states']) if data['states'] else 0
             print(f"✅ API connection successful! Found {flight_count} flights in test area")
             return True
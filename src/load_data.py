@@ -7,6 +7,9 @@ This module handles loading cleaned data into PostgreSQL database:
 - Verify data was loaded correctly
 """
 
+import csv
+import io
+
 import pandas as pd
 from sqlalchemy import create_engine, text
 import psycopg2
@@ -21,10 +24,183 @@ DATABASE_CONFIG = {
     'database': 'airlife_db'
 }
 
+# SQLAlchemy engine shared by all functions (created on first use)
+ENGINE = None
+
+# Rows per INSERT statement when COPY is not available
+INSERT_CHUNKSIZE = 1000
+
+# Indexes to rebuild after each load (same as database_setup.sql)
+# table name -> list of (index name, column)
+TABLE_INDEXES = {
+    'airports': [('idx_airports_iata', 'iata_code'), ('idx_airports_country', 'country')],
+    'flights': [('idx_flights_icao24', 'icao24'), ('idx_flights_country', 'origin_country')],
+}
+
+# CHECK constraints added after each load (same as database_setup.sql)
+# Rows that would break them are removed from the staging table first.
+# table name -> (constraint name, condition)
+TABLE_CHECKS = {
+    'airports': ('airports_coordinates_check',
+                 'latitude BETWEEN -90 AND 90 AND longitude BETWEEN -180 AND 180'),
+}
+
+# SQLSTATE codes meaning the server refused COPY itself
+# (42501 insufficient_privilege, 0A000 feature_not_supported)
+COPY_REJECTED_ERRORS = ('42501', '0A000')
+
+# Regular expression for text that PostgreSQL can cast to a number
+NUMBER_PATTERN = r'^\s*[-+]?([0-9]+\.?[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?\s*$'
+
+class CopyNotAvailable(Exception):
+    """Raised by copy_insert when the database does not allow COPY"""
+
 def get_connection_string():
     """Build PostgreSQL connection string"""
     return f"postgresql://{DATABASE_CONFIG['username']}:{DATABASE_CONFIG['password']}@{DATABASE_CONFIG['host']}:{DATABASE_CONFIG['port']}/{DATABASE_CONFIG['database']}"
 
+def get_engine():
+    """
+    Get the shared SQLAlchemy engine, creating it on first use
+    
+    Reusing one engine keeps its connection pool, so every function does not
+    have to open a new connection to the database.
+    
+    Returns:
+        sqlalchemy.engine.Engine: Engine connected to DATABASE_CONFIG
+    """
+    global ENGINE
+    if ENGINE is None:
+        ENGINE = create_engine(get_connection_string(), future=True)
+    return ENGINE
+
+def copy_insert(table, conn, keys, data_iter):
+    """
+    Insert rows with PostgreSQL COPY instead of one INSERT per row
+
+    Used as the `method` argument of DataFrame.to_sql. The rows are written
+    to an in-memory CSV buffer and streamed to the server with COPY FROM STDIN,
+    which skips the per-statement parse/plan work of INSERT.
+
+    Args:
+        table (pandas.io.sql.SQLTable): Table being written by to_sql
+        conn (sqlalchemy.engine.Connection): Connection used by to_sql
+        keys (list): Column names
+        data_iter (iterable): Rows to insert
+    """
+    # Get the raw psycopg2 connection behind SQLAlchemy
+    dbapi_conn = conn.connection
+
+    with dbapi_conn.cursor() as cur:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # Write NULLs as \N so empty strings stay empty strings
+        writer.writerows(
+            ['\\N' if value is None else value for value in row]
+            for row in data_iter
+        )
+        buffer.seek(0)
+
+        columns = ', '.join(f'"{k}"' for k in keys)
+        if table.schema:
+            table_name = f'{table.schema}.{table.name}'
+        else:
+            table_name = table.name
+
+        sql = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')"
+        try:
+            cur.copy_expert(sql=sql, file=buffer)
+        except psycopg2.Error as e:
+            # Only a rejected COPY should trigger the INSERT fallback,
+            # other errors (bad data, ...) would fail the same way with INSERT
+            if e.pgcode in COPY_REJECTED_ERRORS:
+                raise CopyNotAvailable(str(e)) from e
+            raise
+
+def replace_table(conn, df, table_name, method, chunksize=None):
+    """
+    Replace a table with the rows of a DataFrame, going through a staging table
+    
+    The rows are written to a staging table without indexes, which is then
+    renamed over the old table. Indexes are built once, at the end, instead
+    of being updated for every row. If anything fails, the transaction is
+    rolled back and the old table is kept.
+    
+    If the table has a CHECK constraint in TABLE_CHECKS, rows that fail it
+    (or have a NULL in it) are deleted from the staging table in PostgreSQL
+    before the swap, so the data does not need to be filtered in Python.
+    
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection inside a transaction
+        df (pandas.DataFrame): Data to load
+        table_name (str): Name of the table to replace
+        method: Insert method passed to DataFrame.to_sql
+        chunksize (int): Number of rows per INSERT batch (None for all rows)
+        
+    Returns:
+        int: Number of rows in the new table
+    """
+    staging_name = f"{table_name}_stg"
+
+    # Create the empty staging table from the DataFrame columns
+    df.head(0).to_sql(staging_name, conn, if_exists='replace', index=False)
+
+    # Bulk load the rows
+    df.to_sql(staging_name, conn, if_exists='append', index=False,
+              method=method, chunksize=chunksize)
+
+    # Remove rows that don't pass the table's CHECK constraint
+    row_count = len(df)
+    check = TABLE_CHECKS.get(table_name)
+    if check:
+        check_name, condition = check
+        result = conn.execute(text(
+            f"DELETE FROM {staging_name} WHERE ({condition}) IS NOT TRUE"
+        ))
+        row_count -= result.rowcount
+
+    # Swap the staging table in place of the old one
+    conn.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
+    conn.execute(text(f"ALTER TABLE {staging_name} RENAME TO {table_name}"))
+
+    # Recreate indexes and constraints now that all rows are in
+    for index_name, column in TABLE_INDEXES.get(table_name, []):
+        if column in df.columns:
+            conn.execute(text(f"CREATE INDEX {index_name} ON {table_name} ({column})"))
+
+    if check:
+        conn.execute(text(
+            f"ALTER TABLE {table_name} ADD CONSTRAINT {check_name} CHECK ({condition})"
+        ))
+
+    return row_count
+
+def write_tables(conn, airports_df, flights_df, method, chunksize=None):
+    """
+    Write the airports and flights DataFrames on an open connection
+    
+    Args:
+        conn (sqlalchemy.engine.Connection): Connection inside a transaction
+        airports_df (pandas.DataFrame): Cleaned airport data
+        flights_df (pandas.DataFrame): Cleaned flight data
+        method: Insert method passed to DataFrame.to_sql
+        chunksize (int): Number of rows per INSERT batch (None for all rows)
+        
+    Returns:
+        tuple: (airports loaded, flights loaded)
+    """
+    # Keep the old airports table if there is nothing to load
+    # (e.g. the CSV could not be read)
+    airports_count = 0
+    if not airports_df.empty:
+        airports_count = replace_table(conn, airports_df, 'airports', method, chunksize)
+
+    flights_count = 0
+    if not flights_df.empty:
+        flights_count = replace_table(conn, flights_df, 'flights', method, chunksize)
+
+    return airports_count, flights_count
+
 def load_to_database(airports_df, flights_df):
     """
     Load cleaned data into PostgreSQL database
@@ -35,31 +211,43 @@ def load_to_database(airports_df, flights_df):
     """
     print("💾 Loading data to PostgreSQL database...")
     
-    # Create connection string using the function above
-    connection_string = get_connection_string()
-    
     try:
-        # Create SQLAlchemy engine
-        engine = create_engine(connection_string)
+        # Get the shared SQLAlchemy engine
+        engine = get_engine()
         
-        # Load airports data
-        # Use pandas to_sql method to insert data
-        airports_df.to_sql('airports', engine, if_exists='replace', index=False)
-        print(f"✅ Loaded {len(airports_df)} airports to database")
+        # Load both tables in a single transaction
+        # Use COPY first, fall back to batched multi-row INSERT only if the
+        # server rejects COPY itself (e.g. the role is not allowed to run it)
+        try:
+            with engine.begin() as conn:
+                airports_count, flights_count = write_tables(
+                    conn, airports_df, flights_df, method=copy_insert)
+        except CopyNotAvailable as e:
+            print(f"⚠️  COPY failed ({e}), falling back to batched INSERT")
+            with engine.begin() as conn:
+                airports_count, flights_count = write_tables(
+                    conn, airports_df, flights_df,
+                    method='multi', chunksize=INSERT_CHUNKSIZE)
+
+        if not airports_df.empty:
+            print(f"✅ Loaded {airports_count} airports to database")
+        else:
+            print("ℹ️  No airport data to load")
 
         if not flights_df.empty:
-            flights_df.to_sql('flights', engine, if_exists='replace', index=False)
-            print(f"✅ Loaded {len(flights_df)} flights to database")
+            print(f"✅ Loaded {flights_count} flights to database")
         else:
             print("ℹ️  No flight data to load")
 
         
         # 
         # Parameters explanation:
-        # - 'airports': table name in database
+        # - 'airports_stg': staging table, renamed to 'airports' once loaded
         # - engine: database connection
         # - if_exists='replace': replace table if it exists (use 'append' to add to existing data)
         # - index=False: don't include pandas row index as a column
+        # - method=copy_insert: bulk load with COPY instead of row-by-row INSERT
+        # - method='multi', chunksize: send INSERT statements with many rows each
         
         
     except Exception as e:
@@ -70,36 +258,130 @@ def load_to_database(airports_df, flights_df):
         print("   - Username and password are correct")
         print("   - Tables are created (run database_setup.sql)")
 
+def load_airports_fast(csv_path):
+    """
+    Load the airports CSV straight into PostgreSQL, without pandas
+    
+    The file is streamed into a temporary staging table with COPY, then
+    cleaned and copied into the airports table with one INSERT ... SELECT.
+    Missing values and rows are handled like extract_airports and
+    clean_airports do in pandas: empty, 'N' or '\\N' codes become NULL,
+    non-numeric coordinates or altitudes become NULL, and rows without
+    valid coordinates are dropped.
+    
+    Args:
+        csv_path (str): Path to the airports CSV file (with a header row)
+    """
+    print("💾 Loading airports CSV directly to PostgreSQL...")
+    
+    try:
+        engine = get_engine()
+        
+        with engine.begin() as conn:
+            # Staging table with the same columns as the CSV file
+            # Codes and numbers stay text so empty or bad values can be
+            # turned into NULL below instead of failing the COPY
+            conn.execute(text("""
+            CREATE TEMPORARY TABLE airports_staging (
+                id INTEGER,
+                name TEXT,
+                city TEXT,
+                country TEXT,
+                iata_code TEXT,
+                icao_code TEXT,
+                latitude TEXT,
+                longitude TEXT,
+                altitude TEXT
+            ) ON COMMIT DROP
+            """))
+            
+            # Stream the file to the server
+            with conn.connection.cursor() as cur, open(csv_path, encoding='utf-8') as f:
+                cur.copy_expert(
+                    "COPY airports_staging FROM STDIN WITH (FORMAT CSV, HEADER, "
+                    "NULL '\\N', FORCE_NULL (iata_code, icao_code, latitude, "
+                    "longitude, altitude))",
+                    f
+                )
+            
+            # Same rules as extract_airports + clean_airports:
+            # '', 'N' and '\\N' codes are missing, non-numeric numbers are
+            # missing, and rows without valid coordinates are dropped
+            conn.execute(text("TRUNCATE airports"))
+            result = conn.execute(text("""
+            WITH parsed AS (
+                SELECT id, name, city, country,
+                       NULLIF(NULLIF(iata_code, ''), 'N') AS iata_code,
+                       NULLIF(NULLIF(icao_code, ''), 'N') AS icao_code,
+                       CASE WHEN latitude ~ :number
+                            THEN latitude::DOUBLE PRECISION END AS latitude,
+                       CASE WHEN longitude ~ :number
+                            THEN longitude::DOUBLE PRECISION END AS longitude,
+                       CASE WHEN altitude ~ :number
+                            THEN altitude::NUMERIC END AS altitude
+                FROM airports_staging
+            )
+            INSERT INTO airports (id, name, city, country, iata_code, icao_code,
+                                  latitude, longitude, altitude)
+            SELECT id, name, city, country, iata_code, icao_code,
+                   latitude, longitude, altitude
+            FROM parsed
+            WHERE latitude BETWEEN -90 AND 90
+              AND longitude BETWEEN -180 AND 180
+            """), {'number': NUMBER_PATTERN})
+        
+        print(f"✅ Loaded {result.rowcount} airports to database")
+        
+    except Exception as e:
+        print(f"❌ Error loading airports CSV to database: {e}")
+        print("💡 Make sure the airports table exists (run database_setup.sql)")
+
 def verify_data():
     """
     Verify that data was loaded correctly by running some basic queries
     """
     print("🔍 Verifying data was loaded correctly...")
     
-    connection_string = get_connection_string()
-    
     try:
-        # Create SQLAlchemy engine
-        engine = create_engine(connection_string)
+        # Get the shared SQLAlchemy engine
+        engine = get_engine()
+        
+        # Get counts and samples of both tables in a single query
+        # (one round-trip to the database instead of four)
+        verify_query = """
+        SELECT
+            (SELECT COUNT(*) FROM airports) AS airports_count,
+            (SELECT COUNT(*) FROM flights) AS flights_count,
+            (SELECT json_agg(a) FROM (
+                SELECT name, city, country FROM airports LIMIT 3
+            ) a) AS sample_airports,
+            (SELECT json_agg(f) FROM (
+                SELECT callsign, origin_country, altitude FROM flights LIMIT 3
+            ) f) AS sample_flights
+        """
+        # Read the single row directly, no DataFrame needed for it
+        with engine.connect() as conn:
+            result = conn.execute(text(verify_query)).mappings().one()
         
         # Count airports in database
-        airports_count = pd.read_sql("SELECT COUNT(*) as count FROM airports", engine)
-        print(f"📊 Airports in database: {airports_count.iloc[0]['count']}")
+        print(f"📊 Airports in database: {result['airports_count']}")
         
         # Count flights in database  
-        flights_count = pd.read_sql("SELECT COUNT(*) as count FROM flights", engine)
-        print(f"📊 Flights in database: {flights_count.iloc[0]['count']}")
+        print(f"📊 Flights in database: {result['flights_count']}")
         
         # Show sample airport data
-        sample_airports = pd.read_sql("SELECT name, city, country FROM airports LIMIT 3", engine)
+        # (json_agg returns NULL when the table is empty)
+        sample_airports = pd.DataFrame(result['sample_airports'] or [],
+                                       columns=['name', 'city', 'country'])
         print("\n📋 Sample airports:")
         print(sample_airports.to_string(index=False))
         
         # Show sample flight data (if any exists)
         # Hint: Check if flights table has data first
 
-        if flights_count.iloc[0]['count'] > 0:
-            sample_flights = pd.read_sql("SELECT callsign, origin_country, altitude FROM flights LIMIT 3", engine)
+        if result['flights_count'] > 0:
+            sample_flights = pd.DataFrame(result['sample_flights'],
+                                          columns=['callsign', 'origin_country', 'altitude'])
             print("\n✈️  Sample flights:")
             print(sample_flights.to_string(index=False))
         
@@ -113,10 +395,8 @@ def run_sample_queries():
     """
     print("📈 Running sample analysis queries...")
     
-    connection_string = get_connection_string()
-    
     try:
-        engine = create_engine(connection_string)
+        engine = get_engine()
         
         # Query 1: Airports by country
         print("\n🌍 Top 5 countries by number of airports:")
@@ -132,8 +412,9 @@ def run_sample_queries():
         print(country_results.to_string(index=False))
         
         # Query 2: Flight altitude analysis (if flight data exists)
-        flight_check = pd.read_sql("SELECT COUNT(*) as count FROM flights", engine)
-        if flight_check.iloc[0]['count'] > 0:
+        with engine.connect() as conn:
+            flight_count = conn.execute(text("SELECT COUNT(*) FROM flights")).scalar()
+        if flight_count > 0:
             print("\n✈️  Flight altitude statistics:")
             altitude_query = """
             SELECT 
@@ -157,15 +438,14 @@ def test_database_connection():
     """
     print("🔌 Testing database connection...")
     
-    connection_string = get_connection_string()
-    
     try:
-        engine = create_engine(connection_string)
+        engine = get_engine()
         
         # Try a simple query
-        result = pd.read_sql("SELECT 1 as test", engine)
+        with engine.connect() as conn:
+            result = conn.execute(text("SELECT 1")).scalar()
         
-        if result.iloc[0]['test'] == 1:
+        if result == 1:
             print("✅ Database connection successful!")
             
             # Check if our tables exist
@@ -0,0 +1,14 @@
+"""
+Data Schema Module
+
+Column names shared by the extraction and transformation modules.
+This module has no dependencies so both can import it cheaply.
+"""
+
+# Full 17 columns of a state vector from the OpenSky API, in API order
+FLIGHT_COLUMNS = (
+    'icao24', 'callsign', 'origin_country', 'time_position', 'last_contact',
+    'longitude', 'latitude', 'altitude', 'on_ground', 'velocity',
+    'true_track', 'vertical_rate', 'sensors', 'geo_altitude', 'squawk',
+    'spi', 'position_source'
+)
@@ -10,12 +10,75 @@ This module handles cleaning and transforming the extracted data:
 import pandas as pd
 import numpy as np
 
-def clean_airports(airports_df):
+# Numba is optional: it is only used to speed up very large files
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Run as part of the package (main.py) or directly as a script
+if __package__:
+    from .schema import FLIGHT_COLUMNS
+else:
+    from schema import FLIGHT_COLUMNS
+
+def coordinate_arrays(df):
+    """
+    Get latitude and longitude as float numpy arrays (missing values as NaN)
+    
+    Args:
+        df (pandas.DataFrame): Data with 'latitude' and 'longitude' columns
+        
+    Returns:
+        tuple: (latitude, longitude) numpy arrays
+    """
+    lat = df['latitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+    lon = df['longitude'].to_numpy(dtype=np.float64, na_value=np.nan)
+    return lat, lon
+
+# Below this many rows the numpy version is faster than compiling the Numba one
+NUMBA_MIN_ROWS = 1_000_000
+
+if numba is not None:
+    @numba.njit(cache=True, parallel=True)
+    def _valid_coordinates_kernel(lat, lon):
+        """Check all coordinates in one compiled pass (NaN fails every comparison)"""
+        out = np.empty(lat.shape[0], dtype=np.bool_)
+        for i in numba.prange(lat.shape[0]):
+            out[i] = (-90.0 <= lat[i] <= 90.0) and (-180.0 <= lon[i] <= 180.0)
+        return out
+
+def valid_coordinates_mask(df):
+    """
+    Build one boolean mask of rows with present and valid coordinates
+    
+    Latitude should be between -90 and 90, longitude between -180 and 180.
+    Comparisons with NaN are False, so missing coordinates are rejected too.
+    
+    Args:
+        df (pandas.DataFrame): Data with 'latitude' and 'longitude' columns
+        
+    Returns:
+        numpy.ndarray: True for rows to keep
+    """
+    lat, lon = coordinate_arrays(df)
+
+    # For very large data, one compiled pass avoids building the
+    # intermediate numpy masks
+    if numba is not None and len(lat) >= NUMBA_MIN_ROWS:
+        return _valid_coordinates_kernel(lat, lon)
+
+    return (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180)
+
+def clean_airports(airports_df, filter_coordinates=True):
     """
     Clean and validate airport data
     
     Args:
         airports_df (pandas.DataFrame): Raw airport data from CSV
+        filter_coordinates (bool): Remove rows with missing or invalid
+            coordinates. load_to_database also does it in the database, so
+            the pipeline can skip it here.
         
     Returns:
         pandas.DataFrame: Cleaned airport data
@@ -27,24 +90,21 @@ def clean_airports(airports_df):
     print(f"🧹 Cleaning airport data...")
     print(f"Starting with {len(airports_df)} airports")
     
-    # Make a copy to avoid modifying the original
-    df = airports_df.copy()
-
-    # Remove rows with missing coordinates
-    df = df.dropna(subset=['latitude', 'longitude'])
-    
-    # Remove airports with invalid coordinates
+    # Remove airports with missing or invalid coordinates
     # Latitude should be between -90 and 90
     # Longitude should be between -180 and 180
-    df = df[(df['latitude'] >= -90) & (df['latitude'] <= 90)]
-    df = df[(df['longitude'] >= -180) & (df['longitude'] <= 180)]
+    # The filtered copy is the only copy made, the original is not modified
+    if filter_coordinates:
+        df = airports_df.loc[valid_coordinates_mask(airports_df)].copy()
+    else:
+        df = airports_df.copy(deep=False)
     
-    # Handle missing IATA codes (replace empty strings or 'N' with None)
-    if 'iata_code' in df.columns:
-        df['iata_code'] = df['iata_code'].replace(['', 'N', '\\N'], None)
+    # Missing IATA codes (empty strings, 'N' or '\\N') are already turned
+    # into nulls when the CSV is read (see extract_airports)
     
     # TODO: Convert altitude to numeric (handle non-numeric values)
-    if 'altitude' in df.columns:
+    # (skipped when the column is already numeric)
+    if 'altitude' in df.columns and not pd.api.types.is_numeric_dtype(df['altitude']):
         df['altitude'] = pd.to_numeric(df['altitude'], errors='coerce')
     
     # Print how many airports remain after cleaning
@@ -60,34 +120,27 @@ def clean_flights(flights_df):
     print(f"🧹 Cleaning flight data...")
     print(f"Starting with {len(flights_df)} flights")
     
-    df = flights_df.copy()
-
-    # Full 17 columns from OpenSky API
-    expected_columns = [
-        'icao24', 'callsign', 'origin_country', 'time_position', 'last_contact',
-        'longitude', 'latitude', 'altitude', 'on_ground', 'velocity',
-        'true_track', 'vertical_rate', 'sensors', 'geo_altitude', 'squawk',
-        'spi', 'position_source'
-    ]
-    
-    if df.shape[1] == len(expected_columns):
-        df.columns = expected_columns
+    # set_axis returns a renamed frame, the original is not modified
+    # (with Copy-on-Write the data is only copied if it is changed later)
+    if flights_df.shape[1] == len(FLIGHT_COLUMNS):
+        df = flights_df.set_axis(FLIGHT_COLUMNS, axis=1)
     else:
-        print(f"⚠️ Column count mismatch ({df.shape[1]} != {len(expected_columns)})")
+        print(f"⚠️ Column count mismatch ({flights_df.shape[1]} != {len(FLIGHT_COLUMNS)})")
         return pd.DataFrame()
 
-    # Remove flights with missing coordinates
-    df = df.dropna(subset=['longitude', 'latitude'])
-
-    # Keep only valid coordinates
-    df = df[(df['latitude'] >= -90) & (df['latitude'] <= 90)]
-    df = df[(df['longitude'] >= -180) & (df['longitude'] <= 180)]
+    # Keep only flights with present and valid coordinates
+    df = df.loc[valid_coordinates_mask(df)].copy()
 
     # Convert altitude from meters to feet
-    df['altitude'] = pd.to_numeric(df['altitude'], errors='coerce') * 3.28084
+    # (extract_flights already returns it as float, only convert other inputs)
+    if not pd.api.types.is_float_dtype(df['altitude']):
+        df['altitude'] = pd.to_numeric(df['altitude'], errors='coerce')
+    df['altitude'] = df['altitude'] * 3.28084
 
     # Clean callsign
-    df['callsign'] = df['callsign'].astype(str).str.strip()
+    # Arrow strings are stripped by a C++ kernel instead of a Python loop,
+    # and missing callsigns stay null instead of becoming 'None'
+    df['callsign'] = df['callsign'].astype('string[pyarrow]').str.strip()
 
     print(f"After cleaning: {len(df)} flights remain")
     return df
@@ -151,9 +204,10 @@ def validate_data_quality(df, data_type):
     
     # Check coordinate bounds if applicable
     if 'latitude' in df.columns and 'longitude' in df.columns:
+        lat, lon = coordinate_arrays(df)
         invalid_coords = (
-            (df['latitude'] < -90) | (df['latitude'] > 90) |
-            (df['longitude'] < -180) | (df['longitude'] > 180)
+            (lat < -90) | (lat > 90) |
+            (lon < -180) | (lon > 180)
         ).sum()
         
         if invalid_coords > 0: